@@ -1,5 +1,5 @@
-import json
 import logging
+import orjson
 import asyncio
 from typing import List, Dict, Any
 from backend.pipeline.chunking import DocumentChunker
@@ -16,8 +16,8 @@ logger = logging.getLogger(__name__)
 
 def load_pmc_json(file_path: str) -> Dict[str, Any]:
     """Load PMC JSON file."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
 
 
 def extract_full_text_from_pmc(pmc_data: Dict[str, Any]) -> str:
@@ -45,7 +45,8 @@ def extract_full_text_from_pmc(pmc_data: Dict[str, Any]) -> str:
     return full_text.strip()
 
 
-async def demonstrate_complete_pipeline(pmc_file: str, use_real_api: bool = False):
+async def demonstrate_complete_pipeline(pmc_file: str, use_real_api: bool = False,
+                                        max_concurrency: int = 8):
     """Demo pipeline pmc - embedding - vector storage."""
 
     logger.info("DEMO: COMPLETE PMC → VECTOR PIPELINE")
@@ -126,56 +127,57 @@ async def demonstrate_complete_pipeline(pmc_file: str, use_real_api: bool = Fals
     # Step 5: Embedding process
     logger.info("\nStep 5: Embedding process...")
 
-    embedding_results = []
-    successful_embeddings = 0
-    failed_embeddings = 0
+    # Bound concurrent embedding requests to stay under the API rate limit
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-    for i, chunk in enumerate(chunks):
+    async def embed_chunk(i: int, chunk: Dict[str, Any]) -> Dict[str, Any]:
         section_type = chunk['metadata'].get('section_type', 'unknown')
         section_header = chunk['metadata'].get('section_header', 'Unknown')
 
-        logger.info(f"\n--- Processing Chunk {i+1}/{len(chunks)} ---")
-        logger.info(f"Section: {section_header} ({section_type})")
-        logger.info(f"Content: {chunk['content'][:100]}...")
-
-        try:
-            # Generate embedding
-            embedding = await gemini_client.embed_single(chunk['content'])
-
-            # Create result
-            result = {
-                "chunk_id": chunk['metadata']['chunk_id'],
-                "content": chunk['content'],
-                "metadata": chunk['metadata'],
-                "embedding_vector": embedding,
-                "embedding_dimensions": len(embedding),
-                "embedding_model": gemini_config.embedding_model,
-                "success": True
-            }
-
-            embedding_results.append(result)
-            successful_embeddings += 1
-
-            logger.info(f"Success! Dimensions: {len(embedding)}")
-
-        except Exception as e:
-            logger.error(f"Failed: {str(e)}")
-
-            # Fallback result
-            fallback_vector = [0.0] * 768
-            result = {
-                "chunk_id": chunk['metadata']['chunk_id'],
-                "content": chunk['content'],
-                "metadata": chunk['metadata'],
-                "embedding_vector": fallback_vector,
-                "embedding_dimensions": 768,
-                "embedding_model": "fallback_zero_vector",
-                "success": False,
-                "error": str(e)
-            }
-
-            embedding_results.append(result)
-            failed_embeddings += 1
+        async with semaphore:
+            # Per-chunk logs use lazy %-formatting so nothing is built when INFO is filtered
+            logger.info("\n--- Processing Chunk %d/%d ---", i + 1, len(chunks))
+            logger.info("Section: %s (%s)", section_header, section_type)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Content: %s...", chunk['content'][:100])
+
+            try:
+                # Generate embedding
+                embedding = await gemini_client.embed_single(chunk['content'])
+
+                logger.info("Chunk %d success! Dimensions: %d", i + 1, len(embedding))
+
+                return {
+                    "chunk_id": chunk['metadata']['chunk_id'],
+                    "content": chunk['content'],
+                    "metadata": chunk['metadata'],
+                    "embedding_vector": embedding,
+                    "embedding_dimensions": len(embedding),
+                    "embedding_model": gemini_config.embedding_model,
+                    "success": True
+                }
+
+            except Exception as e:
+                logger.error("Chunk %d failed: %s", i + 1, e)
+
+                # Fallback result
+                fallback_vector = [0.0] * 768
+                return {
+                    "chunk_id": chunk['metadata']['chunk_id'],
+                    "content": chunk['content'],
+                    "metadata": chunk['metadata'],
+                    "embedding_vector": fallback_vector,
+                    "embedding_dimensions": 768,
+                    "embedding_model": "fallback_zero_vector",
+                    "success": False,
+                    "error": str(e)
+                }
+
+    # gather preserves input order, so results line up with chunks
+    embedding_results = await asyncio.gather(
+        *(embed_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+    successful_embeddings = sum(1 for r in embedding_results if r['success'])
+    failed_embeddings = len(embedding_results) - successful_embeddings
 
     # Step 6: Analysis
     logger.info("\nStep 6: Analysis...")
@@ -262,8 +264,8 @@ async def demonstrate_complete_pipeline(pmc_file: str, use_real_api: bool = Fals
 
     # save results
     output_file = f"/Users/maitiendung/TAI LIEU/HOME/research/KGCHAT_new_ver/KGChat-03/output/pmc_chunking_gemini_embedding/pmc_pipeline_results_{pmc_file.replace('.json', '')}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
 
     logger.info(f"Results saved to: {output_file}")
 
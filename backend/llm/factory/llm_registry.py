@@ -1,12 +1,20 @@
 import yaml
 import os
+import re
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 from ..utils.exceptions import ClientNotFoundError
 
 logger = logging.getLogger(__name__)
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+_ENV_VAR_RE = re.compile(r'\$\{([^}]+)\}')
+
 class LLMRegistry:
     def __init__(self, config_path: Optional[str] = None):
         self.config_path = config_path or "backend/llm/configs/llm_configs.yml"
@@ -14,6 +22,8 @@ class LLMRegistry:
         self._clients: Dict[str, type] = {}
         self._configs: Dict[str, type] = {}
         self._defaults: Dict[str, Dict[str, Any]] = {}
+        # One client per (provider, config) so SDK connection pools are reused
+        self._instances: Dict[Tuple[str, frozenset], Any] = {}
     
     def load_config(self) -> None:
         try:
@@ -25,7 +35,7 @@ class LLMRegistry:
             with open(config_file, 'r', encoding='utf-8') as f:
                 content = f.read()
                 content = self._substitute_env_vars(content)
-                self.config_data = yaml.safe_load(content) or {}
+                self.config_data = yaml.load(content, Loader=_YamlLoader) or {}
             
             logger.info(f"Loaded config from {self.config_path}")
         except Exception as e:
@@ -33,11 +43,10 @@ class LLMRegistry:
             self.config_data = {}
     
     def _substitute_env_vars(self, content: str) -> str:
-        import re
         def replace_env_var(match):
             var_name = match.group(1)
             return os.getenv(var_name, f"${{{var_name}}}")
-        return re.sub(r'\$\{([^}]+)\}', replace_env_var, content)
+        return _ENV_VAR_RE.sub(replace_env_var, content)
     
     def _import_class(self, class_path: str):
         try:
@@ -104,9 +113,22 @@ class LLMRegistry:
         
         defaults = self._defaults.get(provider_name, {})
         final_config = {**defaults, **overrides}
-        
+
+        try:
+            cache_key = (provider_name, frozenset(final_config.items()))
+            hash(cache_key)
+        except TypeError:
+            # Unhashable override values (e.g. dicts): build an uncached client
+            cache_key = None
+
+        if cache_key is not None and cache_key in self._instances:
+            return self._instances[cache_key]
+
         config = config_class(**final_config)
-        return client_class(config)
+        client = client_class(config)
+        if cache_key is not None:
+            self._instances[cache_key] = client
+        return client
     
     def get_available_providers(self) -> list:
         """Get list of available providers"""
@@ -1,18 +1,43 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
 from typing import Optional, Dict, Any, List
 import logging
 from ...base.llm_client import BaseLLMClient, LLMResponse
 from ...utils.exceptions import AuthenticationError
+from ...utils.rate_limiter import RateLimiter
 from .gemini_config import GeminiConfig
 
 logger = logging.getLogger(__name__)
 
+# Gemini batch embedding accepts at most 100 texts per request
+EMBED_BATCH_SIZE = 100
+
+_TRANSIENT_STATUS = {408, 429}
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Rate limits, 5xx and network timeouts are worth retrying; auth/400 errors are not."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    # google.api_core exceptions carry the HTTP status in `code`
+    status = getattr(exc, "code", None)
+    if isinstance(status, int):
+        return status in _TRANSIENT_STATUS or status >= 500
+    return False
+
 
 class GeminiClient(BaseLLMClient):
     def __init__(self, config: GeminiConfig):
         super().__init__(config)
         self.config: GeminiConfig = config
         self._model = None
+        # Shared across embed() worker threads so the quota is enforced globally
+        self._rate_limiter = (
+            RateLimiter.per_minute(config.requests_per_minute)
+            if config.requests_per_minute else None
+        )
         self._initialize_client()
 
     def _initialize_client(self) -> None:
@@ -37,6 +62,8 @@ class GeminiClient(BaseLLMClient):
             else:
                 full_prompt = user_prompt
 
+            if self._rate_limiter:
+                self._rate_limiter.acquire()
             response = self._model.generate_content(full_prompt)
 
             message = response.text if response.parts else "No response generated"
@@ -53,13 +80,26 @@ class GeminiClient(BaseLLMClient):
             logger.error(f"Gemini generation failed: {e}")
             raise
 
-    def embed(self, texts: List[str], model: str = None) -> List[List[float]]:
+    def embed(
+        self,
+        texts: List[str],
+        model: str = None,
+        batch_size: int = EMBED_BATCH_SIZE,
+        max_workers: int = 8,
+        max_tries: int = 3,
+    ) -> List[List[float]]:
         """
         Generate embeddings for multiple texts using Gemini API.
 
+        Texts are sent in batches of up to `batch_size` per request and the
+        batches are dispatched concurrently; output order matches input order.
+
         Args:
             texts: List of input strings to embed.
             model: Model to use for embeddings (optional, uses config default if not provided)
+            batch_size: Maximum number of texts per embedding request
+            max_workers: Maximum number of concurrent batch requests
+            max_tries: Attempts per batch before falling back to zero vectors
 
         Returns:
             A list of embedding vectors, one for each input text.
@@ -68,51 +108,64 @@ class GeminiClient(BaseLLMClient):
             return []
 
         embedding_model = model or self.config.embedding_model
+        batches = [texts[i:i + batch_size]
+                   for i in range(0, len(texts), batch_size)]
 
-        try:
-            embeddings = []
+        def embed_batch(batch: List[str]) -> List[List[float]]:
+            return self._embed_batch(batch, embedding_model, max_tries)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            results = list(executor.map(embed_batch, batches))
 
-            # Gemini embedding API requires individual calls for each text
-            for text in texts:
-                # Use the embed_content method from genai
+        embeddings = [embedding for batch in results for embedding in batch]
+        logger.info(
+            f"Generated {len(embeddings)} embeddings using {embedding_model}")
+        return embeddings
+
+    def _embed_batch(self, batch: List[str], embedding_model: str, max_tries: int) -> List[List[float]]:
+        """Embed one batch, retrying transient errors with exponential backoff, falling back to zero vectors."""
+        delay = 2.0
+        for attempt in range(1, max_tries + 1):
+            try:
+                if self._rate_limiter:
+                    self._rate_limiter.acquire()
                 result = genai.embed_content(
                     model=embedding_model,
-                    content=text,
+                    content=batch,
                     task_type="retrieval_document",  # Can be retrieval_document or retrieval_query
                     title=None  # Optional title for the content
                 )
+                return result['embedding']
 
-                # Extract the embedding values
-                embedding = result['embedding']
-                embeddings.append(embedding)
-
-            logger.info(
-                f"Generated {len(embeddings)} embeddings using {embedding_model}")
-            return embeddings
-
-        except Exception as e:
-            logger.warning(
-                f"Gemini embedding failed: {e}. Falling back to zero vectors.")
+            except Exception as e:
+                if attempt < max_tries and _is_transient(e):
+                    logger.warning(
+                        f"Gemini embedding attempt {attempt}/{max_tries} failed: {e}. Retrying in {delay:.0f}s...")
+                    time.sleep(delay)
+                    delay = min(delay * 2, 30.0)
+                    continue
 
-            # Fallback to zero vectors if API fails
-            embeddings = []
-            for _ in texts:
-                # Create a zero vector of standard embedding dimension (768 for text-embedding-004)
-                embedding = [0.0] * 768
-                embeddings.append(embedding)
+                logger.warning(
+                    f"Gemini embedding failed: {e}. Falling back to zero vectors.")
+                break
 
-            return embeddings
+        # Create a zero vector of standard embedding dimension (768 for text-embedding-004)
+        return [[0.0] * 768 for _ in batch]
 
-    async def embed_single(self, text: str, model: str = None) -> List[float]:
+    async def embed_single(self, text: str, model: str = None, max_tries: int = 3) -> List[float]:
         """
         Generate embedding for a single text using Gemini API.
 
         Args:
             text: The input string to embed.
             model: Model to use for embeddings (optional)
+            max_tries: Attempts before falling back to a zero vector
 
         Returns:
             A list of float numbers representing the embedding vector.
         """
-        embeddings = self.embed([text], model)
+        # One text is one request: skip embed()'s batching/thread pool and run the
+        # blocking request directly in a worker thread so callers can overlap requests
+        embeddings = await asyncio.to_thread(
+            self._embed_batch, [text], model or self.config.embedding_model, max_tries)
         return embeddings[0] if embeddings else [0.0] * 768
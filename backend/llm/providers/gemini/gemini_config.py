@@ -7,6 +7,7 @@ class GeminiConfig(BaseLLMConfig):
     embedding_model: str = Field(default="models/text-embedding-004")
     top_p: Optional[float] = Field(default=0.95, ge=0.0, le=1.0)
     top_k: Optional[int] = Field(default=None, ge=1, le=100)
+    requests_per_minute: Optional[int] = Field(default=None, ge=1)
 
     def get_generation_config(self) -> Dict[str, Any]:
         config = {
@@ -0,0 +1,56 @@
+# backend/llm/utils/rate_limiter.py
+
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    A thread-safe token-bucket rate limiter for pacing API requests.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Each
+    request takes one token and only waits when the bucket is empty, so time
+    already spent inside a slow request counts towards the pacing instead of
+    being added on top of a fixed sleep. One instance can be shared across
+    threads to enforce a single global request rate.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[int] = None):
+        """
+        Initializes the RateLimiter.
+
+        Args:
+            rate: Number of requests allowed per second.
+            capacity: Maximum burst size. Defaults to max(1, int(rate)).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be a positive number.")
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: int, capacity: Optional[int] = None) -> "RateLimiter":
+        """Build a limiter from a requests-per-minute quota."""
+        return cls(requests_per_minute / 60.0, capacity)
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            # Token is borrowed from the future; wait until it has refilled
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
@@ -9,6 +9,8 @@ from backend.utils.text_processing import count_tokens
 
 logger = logging.getLogger(__name__)
 
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+
 
 class DocumentChunker:
     """
@@ -40,6 +42,14 @@ class DocumentChunker:
         self.max_chunk_size = max_chunk_tokens * 4
         self.overlap_size = overlap_tokens * 4
 
+        # The splitter only depends on the sizes above, so build it once per chunker
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.max_chunk_size,
+            chunk_overlap=self.overlap_size,
+            length_function=len,
+            separators=["\n\n", "\n", " ", ""]
+        )
+
     def split_into_paragraphs(self, text: str) -> List[str]:
         """
         Split text into paragraphs based on line breaks.
@@ -51,23 +61,25 @@ class DocumentChunker:
             List of paragraphs
         """
         # Split on double line breaks first (preferred paragraph separator)
-        paragraphs = re.split(r'\n\s*\n', text)
+        paragraphs = _PARAGRAPH_BREAK_RE.split(text)
 
-        # Process each potential paragraph to handle single line breaks
+        # Process each potential paragraph to handle single line breaks.
+        # Each piece is stripped exactly once; this stays in C-level str methods
+        # (no regex, and not a candidate for numba, which can't compile str work).
         processed_paragraphs = []
         for para in paragraphs:
+            stripped = para.strip()
             # If paragraph is long enough, keep as is
-            if len(para.strip()) > 100:
-                processed_paragraphs.append(para.strip())
+            if len(stripped) > 100:
+                processed_paragraphs.append(stripped)
             else:
                 # For shorter text blocks, check if they contain single line breaks
                 # that might indicate separate paragraphs
-                sub_paras = re.split(r'\n', para)
-                sub_paras = [sp.strip() for sp in sub_paras if sp.strip()]
-                processed_paragraphs.extend(sub_paras)
+                processed_paragraphs.extend(
+                    sp for sp in map(str.strip, para.split('\n')) if sp)
 
-        # Remove empty paragraphs and ensure each has meaningful content
-        return [p.strip() for p in processed_paragraphs if p.strip() and len(p.strip()) > 10]
+        # Ensure each paragraph has meaningful content (all are already stripped)
+        return [p for p in processed_paragraphs if len(p) > 10]
 
     def create_chunks(
         self,
@@ -91,18 +103,11 @@ class DocumentChunker:
         knowledge_level = document_metadata.get(
             "knowledge_level", 1) if document_metadata else 1
 
-        # Initialize the LangChain text splitter
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.max_chunk_size,
-            chunk_overlap=self.overlap_size,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
-        )
-
         # Split the text into chunks
-        raw_chunks = text_splitter.split_text(text)
+        raw_chunks = self.text_splitter.split_text(text)
+        total_chunks = len(raw_chunks)
         logger.info(
-            f"Document split into {len(raw_chunks)} chunks using LangChain")
+            f"Document split into {total_chunks} chunks using LangChain")
 
         if not raw_chunks:
             return []
@@ -123,7 +128,7 @@ class DocumentChunker:
             # Add chunk-specific metadata to current_chunk_metadata
             current_chunk_metadata["chunk_index"] = i
             current_chunk_metadata["chunk_id"] = str(uuid.uuid4())
-            current_chunk_metadata["total_chunks"] = len(raw_chunks)
+            current_chunk_metadata["total_chunks"] = total_chunks
             current_chunk_metadata["document_id"] = document_id
             current_chunk_metadata["knowledge_level"] = knowledge_level
 
@@ -1,5 +1,6 @@
 import re
 import logging
+from functools import lru_cache
 from typing import List, Optional
 import tiktoken
 
@@ -8,6 +9,30 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_TOKENIZER_MODEL = "cl100k_base"
 
+# Compiled once at import instead of going through re's cache on every call
+_TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+_MULTI_SPACE_RE = re.compile(r' +')
+_EXCESS_NEWLINES_RE = re.compile(r'\n{3,}')
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(encoding_name: str):
+    """
+    Get a tiktoken encoding by name, cached per name.
+
+    Args:
+        encoding_name: Name of the tiktoken encoding
+
+    Returns:
+        The tiktoken Encoding, falling back to cl100k_base if unknown
+    """
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except KeyError:
+        logger.warning(
+            f"Encoding {encoding_name} not found, falling back to cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
+
 
 def count_tokens(text: str, model: Optional[str] = None) -> int:
     """
@@ -25,14 +50,7 @@ def count_tokens(text: str, model: Optional[str] = None) -> int:
 
     try:
         # Get the appropriate encoding for the model
-        encoding_name = model or DEFAULT_TOKENIZER_MODEL
-
-        try:
-            encoding = tiktoken.get_encoding(encoding_name)
-        except KeyError:
-            logger.warning(
-                f"Encoding {encoding_name} not found, falling back to cl100k_base")
-            encoding = tiktoken.get_encoding("cl100k_base")
+        encoding = _get_encoding(model or DEFAULT_TOKENIZER_MODEL)
 
         # Count tokens
         tokens = encoding.encode(text)
@@ -59,7 +77,7 @@ def _approximate_token_count(text: str) -> int:
         Approximate number of tokens
     """
     # Split on whitespace and punctuation
-    words = re.findall(r'\w+|[^\w\s]', text)
+    words = _TOKEN_RE.findall(text)
 
     # Count characters (excluding whitespace)
     char_count = sum(len(word) for word in words)
@@ -100,13 +118,15 @@ def clean_text(text: str) -> str:
         return ""
 
     # Replace multiple spaces with a single space
-    text = re.sub(r' +', ' ', text)
+    if '  ' in text:
+        text = _MULTI_SPACE_RE.sub(' ', text)
 
     # Normalize line breaks
-    text = re.sub(r'\r\n', '\n', text)
+    text = text.replace('\r\n', '\n')
 
     # Remove more than 3 consecutive line breaks
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    if '\n\n\n' in text:
+        text = _EXCESS_NEWLINES_RE.sub('\n\n', text)
 
     return text.strip()
 
@@ -132,8 +152,7 @@ def truncate_text(text: str, max_tokens: int, model: Optional[str] = None) -> st
         return text
 
     try:
-        encoding_name = model or DEFAULT_TOKENIZER_MODEL
-        encoding = tiktoken.get_encoding(encoding_name)
+        encoding = _get_encoding(model or DEFAULT_TOKENIZER_MODEL)
 
         # Encode the text and truncate
         tokens = encoding.encode(text)
@@ -28,11 +28,9 @@ class Embed:
                 text_list = [texts]
             else:
                 text_list = texts
-            embeddings = []
             if self.is_e5:
                 text_list = [f"passage: {text}" for text in text_list]
-            for text in text_list:
-                embeddings.append(self.model.encode(text))
+            embeddings = list(self.model.encode(text_list)) if text_list else []
             if isinstance(texts, str):
                 return embeddings[0] if embeddings else []
             return embeddings
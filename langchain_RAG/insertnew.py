@@ -1,18 +1,26 @@
 import logging
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 import os
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from pathlib import Path
-from langchain_community.vectorstores import FAISS
 from dotenv import load_dotenv
-from langchain_huggingface import HuggingFaceEmbeddings
-import time
 from tqdm import tqdm 
-import re
 from typing import Optional
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import VectorParams, Distance, PointStruct
+from qdrant_client.http.models import (
+    VectorParams, Distance, PointStruct,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+)
 import uuid
+import hashlib
+import json
+import queue
+from collections import OrderedDict, deque
+from itertools import islice
+import numpy as np
+import threading
+import asyncio
+import httpx
+from concurrent.futures import ProcessPoolExecutor
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -28,152 +36,408 @@ class GeminiKeyManager:
         self.max_keys = max_keys
         self.key_pattern = key_pattern
         self.logger = logging.getLogger(__name__)
-    
+        # Đọc env một lần: danh sách (index, key) của các key có giá trị.
+        self.keys: list[tuple[int, str]] = []
+        for i in range(1, max_keys + 1):
+            api_key = os.getenv(key_pattern.format(i))
+            if api_key:
+                self.keys.append((i, api_key))
+        self._pos = next(
+            (pos for pos, (i, _) in enumerate(self.keys) if i >= current_key_index), 0
+        )
+        if self.keys:
+            self.current_key_index = self.keys[self._pos][0]
+
     def get_current_key(self) -> Optional[str]:
-        key_name = self.key_pattern.format(self.current_key_index)
-        api_key = os.getenv(key_name)
-        
-        if not api_key:
+        if not self.keys:
+            key_name = self.key_pattern.format(self.current_key_index)
             self.logger.warning(f"API key {key_name} not found in environment variables")
             return None
-            
-        return api_key
-    
+
+        return self.keys[self._pos][1]
+
     def rotate_key(self) -> Optional[str]:
+        if not self.keys:
+            self.logger.error("No valid API keys found after trying all options")
+            return None
 
-        for _ in range(self.max_keys):
+        self._pos = (self._pos + 1) % len(self.keys)
+        self.current_key_index, api_key = self.keys[self._pos]
+        self.logger.info(f"Rotated to API key {self.key_pattern.format(self.current_key_index)}")
+        return api_key
 
-            self.current_key_index = (self.current_key_index % self.max_keys) + 1
-            
-            key_name = self.key_pattern.format(self.current_key_index)
-            api_key = os.getenv(key_name)
-            
-            if api_key:
-                self.logger.info(f"Rotated to API key {key_name}")
-                return api_key
-        
-        self.logger.error("No valid API keys found after trying all options")
-        return None
+GEMINI_BATCH_EMBED_URL = "https://generativelanguage.googleapis.com/v1beta/{model}:batchEmbedContents"
+
+
+async def embed_batch(
+    session: httpx.AsyncClient,
+    api_key: str,
+    batch: list[str],
+    model: str,
+) -> list[list[float]]:
+    model_path = model if model.startswith("models/") else f"models/{model}"
+    resp = await session.post(
+        GEMINI_BATCH_EMBED_URL.format(model=model_path),
+        headers={"x-goog-api-key": api_key},
+        json={
+            "requests": [
+                {
+                    "model": model_path,
+                    "content": {"parts": [{"text": text}]},
+                    # Khớp với embed_documents cũ; querynew embed câu hỏi bằng RETRIEVAL_QUERY.
+                    "taskType": "RETRIEVAL_DOCUMENT",
+                }
+                for text in batch
+            ]
+        },
+    )
+    resp.raise_for_status()
+    return [e["values"] for e in resp.json()["embeddings"]]
 
-def batch_embed_with_manager(
-    key_manager: GeminiKeyManager,
+
+def make_key_pool(key_manager: GeminiKeyManager) -> asyncio.Queue:
+    """Mỗi key nằm trong pool đúng một lần, nên mỗi key chỉ có một request đang chạy."""
+    if not key_manager.keys:
+        raise RuntimeError("Không tìm thấy API key hợp lệ cho Gemini.")
+    keys: asyncio.Queue = asyncio.Queue()
+    for _, api_key in key_manager.keys:
+        keys.put_nowait(api_key)
+    return keys
+
+
+async def embed_chunks(
+    session: httpx.AsyncClient,
+    keys: asyncio.Queue,
     chunks: list[str],
     model_name: str,
     batch_size: int = 12,
     sleep: float = 2.0,
     max_retries_per_batch: int = 6,
-):
-    embeddings = []
-    for i in tqdm(range(0, len(chunks), batch_size)):
-        batch = chunks[i:i+batch_size]
-        success = False
-        attempt = 0
-
-        while not success and attempt < max_retries_per_batch:
-            api_key = key_manager.get_current_key() or key_manager.rotate_key()
-            if not api_key:
-                raise RuntimeError("Không tìm thấy API key hợp lệ cho Gemini.")
+) -> list[list[float]]:
+    loop = asyncio.get_running_loop()
 
-            embedder = GoogleGenerativeAIEmbeddings(model=model_name, google_api_key=api_key)
+    async def run_batch(i: int) -> list[list[float]]:
+        batch = chunks[i:i+batch_size]
+        for attempt in range(1, max_retries_per_batch + 1):
+            api_key = await keys.get()
             try:
-                vecs = embedder.embed_documents(batch)
-                embeddings.extend(vecs)
-                success = True
-            except Exception as e:
-                msg = str(e).lower()
-                attempt += 1
-                if "429" in msg or "quota" in msg:
+                vecs = await embed_batch(session, api_key, batch, model_name)
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                if status == 429:
                     logger.warning(f"Key {api_key[:6]}... quota exceeded → rotate.")
-                    key_manager.rotate_key()
-                    time.sleep(min(2.0 * attempt, 10.0))
+                    loop.call_later(min(2.0 * attempt, 10.0), keys.put_nowait, api_key)
                     continue
-                if "403" in msg or "suspended" in msg:
+                if status == 403:
                     logger.error(f"Key {api_key[:6]}... suspended → skip.")
-                    key_manager.rotate_key()
+                    loop.call_later(10.0, keys.put_nowait, api_key)
+                    continue
+                keys.put_nowait(api_key)
+                if status >= 500:
+                    # 5xx (thường là 503) là lỗi tạm thời phía Gemini, không phải lỗi của key.
+                    logger.warning(f"Batch {i//batch_size}: Gemini {status} → retry.")
+                    await asyncio.sleep(min(2.0 * attempt, 10.0))
                     continue
                 raise
+            except httpx.TransportError as e:
+                # ReadTimeout, ConnectError, ...: mạng chập chờn, thử lại sau.
+                keys.put_nowait(api_key)
+                logger.warning(f"Batch {i//batch_size}: {type(e).__name__} → retry.")
+                await asyncio.sleep(min(2.0 * attempt, 10.0))
+                continue
+            except BaseException:
+                # Gồm cả CancelledError: luôn trả key về pool.
+                keys.put_nowait(api_key)
+                raise
+            loop.call_later(sleep, keys.put_nowait, api_key)  # giảm burst trên từng key
+            return vecs
+        raise RuntimeError(f"Batch {i//batch_size} thất bại sau {max_retries_per_batch} lần thử.")
 
-        if not success:
-            raise RuntimeError(f"Batch {i//batch_size} thất bại sau {max_retries_per_batch} lần thử.")
+    tasks = [asyncio.create_task(run_batch(i)) for i in range(0, len(chunks), batch_size)]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # Một batch lỗi thì cả file bị bỏ: huỷ các batch còn lại để không tốn quota,
+        # và chờ chúng dừng hẳn để key được trả về pool.
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return [v for vecs in results for v in vecs]
 
-        time.sleep(sleep)  # giảm burst
 
-    return embeddings
+def batch_embed_with_manager(
+    key_manager: GeminiKeyManager,
+    chunks: list[str],
+    model_name: str,
+    batch_size: int = 12,
+    sleep: float = 2.0,
+    max_retries_per_batch: int = 6,
+):
+    async def _run():
+        keys = make_key_pool(key_manager)
+        async with httpx.AsyncClient(timeout=60.0) as session:
+            return await embed_chunks(
+                session, keys, chunks, model_name,
+                batch_size=batch_size, sleep=sleep, max_retries_per_batch=max_retries_per_batch,
+            )
+
+    return asyncio.run(_run())
 
 DATA_DIR = r"C:\Users\NC\Downloads\NEO4Jsetup\123\datatext"
 COLLECTION = "database2"
 EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-001")  # nên đồng bộ '004'
+MAX_KEYS = 14
+BATCH_UPSERT = 512
+# Số vector (float32) giữ lại theo hash nội dung chunk để không embed lại đoạn trùng giữa các file.
+EMBED_CACHE_SIZE = 10_000
 
-client = QdrantClient(url="http://localhost:6333")
-try:
-    client.get_collection(COLLECTION)
-    client.delete_collection(COLLECTION)
-except Exception:
-    pass
-
+splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
 
-client.create_collection(
-    collection_name=COLLECTION,
-    vectors_config=VectorParams(size=3072, distance=Distance.COSINE),
-)
 
+MIN_CHUNK_CHARS = 40
 
-splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-manager = GeminiKeyManager(current_key_index=1, max_keys=14)
+# Checkpoint JSONL: mỗi dòng là một file đã upsert xong. INSERT_RESUME=1 để chạy tiếp
+# sau khi crash (giữ collection, bỏ qua file đã xong) thay vì xoá và insert lại từ đầu.
+CHECKPOINT_PATH = Path(os.getenv("INSERT_CHECKPOINT", "insert_checkpoint.jsonl"))
+RESUME = os.getenv("INSERT_RESUME") == "1"
+# Namespace cố định để point id suy ra từ (file, chunk): upsert lại file dở dang sẽ ghi đè, không nhân đôi.
+POINT_NAMESPACE = uuid.UUID("6f1c2b1e-3d4a-5b6c-8d9e-0a1b2c3d4e5f")
 
 
-folder = Path(DATA_DIR)
-txt_files = sorted(folder.glob("*.txt"))
+def _is_trivial_chunk(chunk: str) -> bool:
+    """Chunk quá ngắn hoặc không có chữ cái (header lẻ, bảng số) thì không đáng embed."""
+    stripped = chunk.strip()
+    return len(stripped) < MIN_CHUNK_CHARS or not any(c.isalpha() for c in stripped)
 
-BATCH_UPSERT = 512
-points_buf = []
-total_chunks = 0
 
-for fp in tqdm(txt_files, desc="Processing files"):
+def chunk_file(fp: Path) -> tuple[Path, Optional[list[str]], Optional[str]]:
+    """Đọc và split một file; chạy trong worker process nên trả lỗi về dạng chuỗi."""
     try:
         text = fp.read_text(encoding="utf-8")
     except Exception as e:
-        logger.error(f"Read error {fp.name}: {e}")
-        continue
-
-    chunks = splitter.split_text(text)
-    if not chunks:
-        continue
-
-
-    vecs = batch_embed_with_manager(
-        key_manager=manager,
-        chunks=chunks,
-        model_name=EMBED_MODEL,
-        batch_size=12,
-        sleep=2.0
-    )
-
-
-    if len(vecs) != len(chunks):
-        raise RuntimeError(f"Embedding count mismatch for {fp.name}: {len(vecs)} vs {len(chunks)}")
-
-    for idx, (ch, v) in enumerate(zip(chunks, vecs), start=1):
-        pid = str(uuid.uuid4())
-        points_buf.append(PointStruct(
-            id=pid,
-            vector=v,
-            payload={
-                "text": ch,          
-                "doc": fp.stem,
-                "chunk": idx
-            }
-        ))
-        total_chunks += 1
-
-        if len(points_buf) >= BATCH_UPSERT:
-            client.upsert(collection_name=COLLECTION, points=points_buf)
-            points_buf.clear()
-
-
-if points_buf:
-    client.upsert(collection_name=COLLECTION, points=points_buf)
-print(f"✅ Đã insert {total_chunks} vectors vào Qdrant collection '{COLLECTION}'")
+        return fp, None, str(e)
+    return fp, [ch for ch in splitter.split_text(text) if not _is_trivial_chunk(ch)], None
+
+
+def _load_checkpoint(path: Path) -> set[str]:
+    """Tên các file đã upsert xong ở lần chạy trước."""
+    if not path.exists():
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {json.loads(line)["doc"] for line in f if line.strip()}
+
+
+def main():
+    client = QdrantClient(url="http://localhost:6333")
+    done = _load_checkpoint(CHECKPOINT_PATH) if RESUME else set()
+    resuming = bool(done) and client.collection_exists(COLLECTION)
+
+    if resuming:
+        logger.info(f"Resuming: {len(done)} files already in '{COLLECTION}'")
+    else:
+        done = set()
+        CHECKPOINT_PATH.unlink(missing_ok=True)
+        try:
+            client.get_collection(COLLECTION)
+            client.delete_collection(COLLECTION)
+        except Exception:
+            pass
+
+        client.create_collection(
+            collection_name=COLLECTION,
+            vectors_config=VectorParams(size=3072, distance=Distance.COSINE, on_disk=True),
+            # Vector gốc float32 để trên disk, bản int8 giữ trong RAM cho search; query rescore lại bằng vector gốc.
+            quantization_config=ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True)
+            ),
+        )
+
+    key_manager = GeminiKeyManager(max_keys=MAX_KEYS)
+    if not key_manager.keys:
+        raise RuntimeError("Không tìm thấy API key hợp lệ cho Gemini.")
+    # Số file được embed đồng thời; batch của các file này chia nhau pool key.
+    files_in_flight = len(key_manager.keys) * 2
+
+    folder = Path(DATA_DIR)
+    txt_files = [fp for fp in sorted(folder.glob("*.txt")) if fp.name not in done]
+
+    total_chunks = 0
+
+    # Pipeline: chunk (process pool) -> embed (asyncio) -> upsert, nối bằng queue có giới hạn.
+    # Mỗi stage báo kết thúc bằng sentinel None.
+    q_chunks = queue.Queue(maxsize=files_in_flight)
+    q_upsert = queue.Queue(maxsize=files_in_flight)
+    errors: list[Exception] = []
+
+    def chunk_stage():
+        # Split là regex thuần Python nên chạy song song bằng process để tránh GIL.
+        # Chỉ giữ một cửa sổ future cố định (map() sẽ submit hết và giữ mọi kết quả trong RAM),
+        # nên khi embed chậm thì q_chunks đầy và việc đọc file cũng dừng theo.
+        files = iter(txt_files)
+        try:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+                pending = deque(ex.submit(chunk_file, fp) for fp in islice(files, files_in_flight * 2))
+                try:
+                    while pending:
+                        fp, chunks, err = pending.popleft().result()
+                        if errors:
+                            break
+                        nxt = next(files, None)
+                        if nxt is not None:
+                            pending.append(ex.submit(chunk_file, nxt))
+                        if err is not None:
+                            logger.error(f"Read error {fp.name}: {err}")
+                            continue
+                        if chunks:
+                            q_chunks.put((fp, chunks))
+                finally:
+                    if pending:
+                        # Dừng sớm (lỗi ở đây hoặc stage khác): huỷ các file chưa chạy thay vì chờ.
+                        ex.shutdown(wait=False, cancel_futures=True)
+        except Exception as e:
+            # split lỗi trong worker hoặc pool hỏng (BrokenProcessPool) đều tới đây.
+            logger.error(f"Chunk stage error: {e}")
+            errors.append(e)
+        finally:
+            q_chunks.put(None)
+
+    async def embed_stage_async():
+        keys = make_key_pool(key_manager)
+        in_flight = asyncio.Semaphore(files_in_flight)
+        # hash(chunk) -> vector; chỉ truy cập trong event loop nên không cần lock.
+        embed_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+
+        async def embed_file(fp: Path, chunks: list[str]):
+            try:
+                hashes = [hashlib.sha256(ch.encode("utf-8")).hexdigest() for ch in chunks]
+                # Lấy vector đã có trước khi await, vì task khác có thể evict trong lúc chờ.
+                found = {h: embed_cache[h] for h in hashes if h in embed_cache}
+                missing = {h: ch for h, ch in zip(hashes, chunks) if h not in found}
+                new_vecs = await embed_chunks(
+                    session, keys, list(missing.values()), EMBED_MODEL,
+                    batch_size=12,
+                    sleep=2.0
+                ) if missing else []
+                if len(new_vecs) != len(missing):
+                    raise RuntimeError(f"Embedding count mismatch for {fp.name}: {len(new_vecs)} vs {len(missing)}")
+
+                found.update((h, np.asarray(v, dtype=np.float32)) for h, v in zip(missing, new_vecs))
+                vecs = [found[h].tolist() for h in hashes]
+
+                embed_cache.update(found)
+                for h in found:
+                    embed_cache.move_to_end(h)
+                while len(embed_cache) > EMBED_CACHE_SIZE:
+                    embed_cache.popitem(last=False)
+
+                await asyncio.to_thread(q_upsert.put, (fp, chunks, vecs))
+            except Exception as e:
+                logger.error(f"Embed error {fp.name}: {e}")
+                errors.append(e)
+            finally:
+                in_flight.release()
+
+        async with httpx.AsyncClient(timeout=60.0) as session:
+            tasks = []
+            while True:
+                item = await asyncio.to_thread(q_chunks.get)
+                if item is None:
+                    break
+                if errors:
+                    # Đã có lỗi: chỉ drain queue để các stage khác thoát được.
+                    continue
+                await in_flight.acquire()
+                tasks.append(asyncio.create_task(embed_file(*item)))
+            await asyncio.gather(*tasks)
+
+    def embed_stage():
+        try:
+            asyncio.run(embed_stage_async())
+        except Exception as e:
+            logger.error(f"Embed stage error: {e}")
+            errors.append(e)
+        finally:
+            q_upsert.put(None)
+
+    def upsert_stage():
+        nonlocal total_chunks
+        points_buf = []
+        # File đã đưa hết point vào points_buf nhưng chưa gửi; ghi checkpoint sau khi gửi.
+        buffered_files: list[str] = []
+        ckpt = open(CHECKPOINT_PATH, "a", encoding="utf-8")
+
+        def flush(wait: bool):
+            nonlocal points_buf
+            if points_buf:
+                client.upsert(collection_name=COLLECTION, points=points_buf, wait=wait)
+                points_buf = []
+            for name in buffered_files:
+                ckpt.write(json.dumps({"doc": name}) + "\n")
+            buffered_files.clear()
+            ckpt.flush()
+            os.fsync(ckpt.fileno())
+
+        pbar = tqdm(total=len(txt_files), desc="Processing files")
+        while True:
+            item = q_upsert.get()
+            if item is None:
+                break
+            if errors:
+                continue
+            fp, chunks, vecs = item
+            try:
+                for idx, (ch, v) in enumerate(zip(chunks, vecs), start=1):
+                    pid = str(uuid.uuid5(POINT_NAMESPACE, f"{fp.name}:{idx}"))
+                    points_buf.append(PointStruct(
+                        id=pid,
+                        vector=v,
+                        payload={
+                            "text": ch,
+                            "doc": fp.stem,
+                            "chunk": idx
+                        }
+                    ))
+                    total_chunks += 1
+
+                    if len(points_buf) >= BATCH_UPSERT:
+                        # Không chờ ack từng batch; Qdrant vẫn áp dụng các update theo thứ tự.
+                        flush(wait=False)
+                buffered_files.append(fp.name)
+            except Exception as e:
+                logger.error(f"Upsert error {fp.name}: {e}")
+                errors.append(e)
+                continue
+            pbar.update(1)
+
+        try:
+            if not errors:
+                # Batch cuối chờ ack để collection đã đầy đủ khi script kết thúc.
+                flush(wait=True)
+        except Exception as e:
+            logger.error(f"Final upsert error: {e}")
+            errors.append(e)
+        finally:
+            ckpt.close()
+            pbar.close()
+
+    threads = [
+        threading.Thread(target=chunk_stage, name="chunker"),
+        threading.Thread(target=embed_stage, name="embedder"),
+        threading.Thread(target=upsert_stage, name="upserter"),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0]
+    print(f"✅ Đã insert {total_chunks} vectors vào Qdrant collection '{COLLECTION}'")
+
+
+if __name__ == "__main__":
+    main()
 
 # DATA_DIR = r"C:\Users\NC\Downloads\NEO4Jsetup\123\datatext"
 # folder = Path(DATA_DIR)
@@ -7,10 +7,13 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 import logging, time
+import functools
 from typing import Optional
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from qdrant_client import QdrantClient
+from qdrant_client.http.models import SearchParams, QuantizationSearchParams
 from langchain_qdrant import QdrantVectorStore
+from langchain_core.embeddings import Embeddings
 
 logger = logging.getLogger(__name__)
 
@@ -25,32 +28,35 @@ class GeminiKeyManager:
         self.max_keys = max_keys
         self.key_pattern = key_pattern
         self.logger = logging.getLogger(__name__)
-    
+        # Đọc env một lần: danh sách (index, key) của các key có giá trị.
+        self.keys: list[tuple[int, str]] = []
+        for i in range(1, max_keys + 1):
+            api_key = os.getenv(key_pattern.format(i))
+            if api_key:
+                self.keys.append((i, api_key))
+        self._pos = next(
+            (pos for pos, (i, _) in enumerate(self.keys) if i >= current_key_index), 0
+        )
+        if self.keys:
+            self.current_key_index = self.keys[self._pos][0]
+
     def get_current_key(self) -> Optional[str]:
-        key_name = self.key_pattern.format(self.current_key_index)
-        api_key = os.getenv(key_name)
-        
-        if not api_key:
+        if not self.keys:
+            key_name = self.key_pattern.format(self.current_key_index)
             self.logger.warning(f"API key {key_name} not found in environment variables")
             return None
-            
-        return api_key
-    
-    def rotate_key(self) -> Optional[str]:
 
-        for _ in range(self.max_keys):
+        return self.keys[self._pos][1]
 
-            self.current_key_index = (self.current_key_index % self.max_keys) + 1
-            
-            key_name = self.key_pattern.format(self.current_key_index)
-            api_key = os.getenv(key_name)
-            
-            if api_key:
-                self.logger.info(f"Rotated to API key {key_name}")
-                return api_key
-        
-        self.logger.error("No valid API keys found after trying all options")
-        return None
+    def rotate_key(self) -> Optional[str]:
+        if not self.keys:
+            self.logger.error("No valid API keys found after trying all options")
+            return None
+
+        self._pos = (self._pos + 1) % len(self.keys)
+        self.current_key_index, api_key = self.keys[self._pos]
+        self.logger.info(f"Rotated to API key {self.key_pattern.format(self.current_key_index)}")
+        return api_key
 
 
 def load_llm_gemini_with_manager(
@@ -58,39 +64,18 @@ def load_llm_gemini_with_manager(
     model_name: str = "gemini-2.0-flash",
     temperature: float = 0.5,
     max_output_tokens: int = 512,
-    max_retries: int = 6
 ) -> ChatGoogleGenerativeAI:
-    attempt = 0
-    while attempt < max_retries:
-        api_key = key_manager.get_current_key() or key_manager.rotate_key()
-        if not api_key:
-            raise RuntimeError("Không tìm thấy API key hợp lệ cho Gemini.")
-
-        try:
-            llm = ChatGoogleGenerativeAI(
-                model=model_name,
-                google_api_key=api_key,
-                temperature=temperature,
-                max_output_tokens=max_output_tokens,
-            )
-            _ = llm.invoke("ping")  
-            return llm
-
-        except Exception as e:
-            msg = str(e).lower()
-            attempt += 1
-            if "429" in msg or "quota" in msg:
-                logger.warning(f"Key {api_key[:6]}... quota exceeded → rotate.")
-                key_manager.rotate_key()
-                time.sleep(min(2.0 * attempt, 10.0))
-                continue
-            if "403" in msg or "suspended" in msg:
-                logger.error(f"Key {api_key[:6]}... suspended → skip.")
-                key_manager.rotate_key()
-                continue
-            raise
-
-    raise RuntimeError(f"Không khởi tạo được Gemini LLM sau {max_retries} lần thử.")
+    # Constructor không gọi mạng; lỗi quota chỉ xuất hiện lúc invoke (xoay key ở invoke_with_rotation).
+    api_key = key_manager.get_current_key() or key_manager.rotate_key()
+    if not api_key:
+        raise RuntimeError("Không tìm thấy API key hợp lệ cho Gemini.")
+
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        google_api_key=api_key,
+        temperature=temperature,
+        max_output_tokens=max_output_tokens,
+    )
 
 custom_prompt_template = """
 Use the pieces of information provided in the context to answer user's question.
@@ -108,6 +93,22 @@ Start the answer directly. No small talk.
 
 def set_custom_prompt(tpl: str):
     return PromptTemplate(template=tpl, input_variables=["context", "question"])
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Bọc một Embeddings và LRU-cache embed_query để query lặp lại không gọi API lần nữa."""
+
+    def __init__(self, inner: Embeddings, maxsize: int = 1024):
+        self.inner = inner
+        self._embed_query = functools.lru_cache(maxsize=maxsize)(inner.embed_query)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed_query(text)
+
+
 manager = GeminiKeyManager(current_key_index=1, max_keys=14)  # chỉnh max_keys theo số key bạn có
 
 
@@ -115,31 +116,66 @@ manager = GeminiKeyManager(current_key_index=1, max_keys=14)  # chỉnh max_keys
 
 api_key = os.getenv("GOOGLE_API_KEY")
 embed_model = os.getenv("EMBED_MODEL", "text-embedding-001")
-embedding= GoogleGenerativeAIEmbeddings(model=embed_model, google_api_key=api_key)
-client = QdrantClient(url="http://localhost:6333")
-db = QdrantVectorStore.from_existing_collection(
-    embedding=embedding,                 
+embedding = CachedQueryEmbeddings(GoogleGenerativeAIEmbeddings(model=embed_model, google_api_key=api_key))
+client = QdrantClient(url="http://localhost:6333", prefer_grpc=True)
+db = QdrantVectorStore(
+    client=client,                       # dùng chung một client gRPC cho mọi query
     collection_name="database2",
-    url="http://localhost:6333",         # kết nối HTTP
+    embedding=embedding,
     content_payload_key="text",          # payload chứa nội dung chunk
-    prefer_grpc=False                    # để chắc dùng HTTP
 )
-llm = load_llm_gemini_with_manager(manager, model_name="gemini-2.0-flash")
-qa_chain = RetrievalQA.from_chain_type(
-    llm=llm,
-    chain_type="stuff",
-    retriever=db.as_retriever(search_kwargs={"k": 5}),
-    return_source_documents=True,
-    chain_type_kwargs={"prompt": set_custom_prompt(custom_prompt_template)},
-)
-user_query = input("Write Query Here: ")
-response = qa_chain.invoke({"query": user_query})
-print(response["result"])
-print("\n=== SOURCES ===")
-for i, doc in enumerate(response["source_documents"], 1):
-    meta = doc.metadata
-    print(f"[{i}] doc={meta.get('doc')} | chunk={meta.get('chunk')}")
-    print(doc.page_content[:200].replace("\n", " "), "\n")
+retriever = db.as_retriever(search_kwargs={
+    "k": 5,
+    # collection dùng int8 scalar quantization, rescore bằng vector gốc để giữ độ chính xác
+    "search_params": SearchParams(quantization=QuantizationSearchParams(rescore=True)),
+})
+
+
+def build_qa_chain() -> RetrievalQA:
+    llm = load_llm_gemini_with_manager(manager, model_name="gemini-2.0-flash")
+    return RetrievalQA.from_chain_type(
+        llm=llm,
+        chain_type="stuff",
+        retriever=retriever,
+        return_source_documents=True,
+        chain_type_kwargs={"prompt": set_custom_prompt(custom_prompt_template)},
+    )
+
+
+def invoke_with_rotation(query: str, max_retries: int = 6) -> dict:
+    """Gọi qa_chain; gặp 429/403 thì xoay sang key kế tiếp, dựng lại chain rồi thử lại."""
+    global qa_chain
+    for attempt in range(1, max_retries + 1):
+        try:
+            return qa_chain.invoke({"query": query})
+        except Exception as e:
+            msg = str(e).lower()
+            if "429" in msg or "quota" in msg:
+                logger.warning(f"Key {manager.current_key_index} quota exceeded → rotate.")
+                manager.rotate_key()
+                time.sleep(min(2.0 * attempt, 10.0))
+            elif "403" in msg or "suspended" in msg:
+                logger.error(f"Key {manager.current_key_index} suspended → skip.")
+                manager.rotate_key()
+            else:
+                raise
+            qa_chain = build_qa_chain()
+
+    raise RuntimeError(f"Gemini LLM vẫn lỗi sau {max_retries} lần thử.")
+
+
+qa_chain = build_qa_chain()
+while True:
+    user_query = input("Write Query Here: ").strip()
+    if not user_query or user_query.lower() in ("exit", "quit"):
+        break
+    response = invoke_with_rotation(user_query)
+    print(response["result"])
+    print("\n=== SOURCES ===")
+    for i, doc in enumerate(response["source_documents"], 1):
+        meta = doc.metadata
+        print(f"[{i}] doc={meta.get('doc')} | chunk={meta.get('chunk')}")
+        print(doc.page_content[:200].replace("\n", " "), "\n")
 
 
 
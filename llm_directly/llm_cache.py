@@ -0,0 +1,180 @@
+import atexit
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    Exact-match cache for deterministic LLM calls.
+
+    Entries live in an in-memory LRU; when disk_path is given and diskcache
+    is installed they are also persisted so hits survive across runs.
+    """
+
+    def __init__(self, maxsize: int = 1024, disk_path: Optional[str] = None):
+        self.maxsize = maxsize
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self.hits = 0
+        self.misses = 0
+
+        if disk_path:
+            if diskcache is None:
+                logger.warning("diskcache is not installed, LLM cache is memory-only")
+            else:
+                self._disk = diskcache.Cache(disk_path)
+                logger.info(f"LLM cache persisted to: {disk_path}")
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        system_prompt: Optional[str],
+        user_prompt: str,
+        temperature: float,
+    ) -> str:
+        payload = json.dumps(
+            {
+                "provider": provider,
+                "model": model,
+                "sys": system_prompt,
+                "user": user_prompt,
+                "temp": temperature,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self._remember(key, value)
+        if self._disk is not None:
+            self._disk.set(key, value)
+
+    def _remember(self, key: str, value: str) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+
+class SemanticLLMCache:
+    """
+    Similarity cache for paraphrased prompts.
+
+    User prompts are embedded with a small local sentence-transformers model
+    and matched by cosine similarity in a FAISS flat index. Each namespace
+    (provider, model, system prompt) has its own index so answers never leak
+    across models or system prompts.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        persist_path: Optional[str] = None,
+    ):
+        import faiss
+        import numpy as np
+        from sentence_transformers import SentenceTransformer
+
+        self._faiss = faiss
+        self._np = np
+        self.threshold = threshold
+        self.persist_path = persist_path
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self._dim = self._model.get_sentence_embedding_dimension()
+        self._indexes: Dict[str, Tuple["faiss.IndexFlatIP", List[str]]] = {}
+        self._lock = threading.Lock()
+        self._embed = functools.lru_cache(maxsize=256)(self._encode)
+        self.hits = 0
+        self.misses = 0
+
+        if persist_path:
+            self.load()
+            atexit.register(self.save)
+
+    def _encode(self, text: str) -> "np.ndarray":
+        emb = self._model.encode([text], normalize_embeddings=True)
+        return self._np.asarray(emb, dtype=self._np.float32)
+
+    def get(self, namespace: str, prompt: str) -> Optional[str]:
+        emb = self._embed(prompt)
+        with self._lock:
+            entry = self._indexes.get(namespace)
+            if entry is not None and entry[0].ntotal:
+                index, responses = entry
+                D, I = index.search(emb, 1)
+                if D[0][0] >= self.threshold:
+                    self.hits += 1
+                    return responses[I[0][0]]
+            self.misses += 1
+        return None
+
+    def set(self, namespace: str, prompt: str, response: str) -> None:
+        emb = self._embed(prompt)
+        with self._lock:
+            if namespace not in self._indexes:
+                self._indexes[namespace] = (self._faiss.IndexFlatIP(self._dim), [])
+            index, responses = self._indexes[namespace]
+            index.add(emb)
+            responses.append(response)
+
+    def save(self) -> None:
+        if not self.persist_path:
+            return
+        with self._lock:
+            data = {
+                ns: (self._faiss.serialize_index(index), responses)
+                for ns, (index, responses) in self._indexes.items()
+            }
+        with open(self.persist_path, "wb") as f:
+            pickle.dump(data, f)
+        logger.info(f"Saved semantic LLM cache to: {self.persist_path}")
+
+    def load(self) -> None:
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        with open(self.persist_path, "rb") as f:
+            data = pickle.load(f)
+        with self._lock:
+            self._indexes = {
+                ns: (self._faiss.deserialize_index(raw), responses)
+                for ns, (raw, responses) in data.items()
+            }
+        logger.info(f"Loaded semantic LLM cache from: {self.persist_path}")
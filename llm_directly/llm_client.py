@@ -1,29 +1,151 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Iterator, Union
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
 import logging
-from openai import OpenAI
-import ollama
 import sys
+import asyncio
+import atexit
+import functools
+import random
+import time
+import httpx
+if __package__:
+    from .llm_cache import LLMCache, SemanticLLMCache
+else:
+    # Chạy trực tiếp `python llm_directly/llm_client.py`: thư mục của script nằm trên sys.path.
+    from llm_cache import LLMCache, SemanticLLMCache
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+# Giới hạn thời gian chờ mỗi provider khi gọi song song trong Operator.
+GENERATE_TIMEOUT = 120.0
+
+# Tham số request cố định của từng provider, dựng một lần thay vì mỗi lần gọi.
+_GEMINI_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    # "top_p": 0.9,
+    # "top_k": 40,
+    "max_output_tokens": 1024,
+}
+_OPENAI_DEFAULTS = {"temperature": 0.0, "max_tokens": 1024}
+_OLLAMA_OPTS = {"temperature": 0.0, "num_predict": 1024}
+
+_TRANSIENT_STATUS = {408, 409, 429}
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Chỉ retry lỗi tạm thời (mạng, timeout, rate limit, 5xx); lỗi auth/400 thì raise ngay."""
+    if isinstance(exc, (TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    # openai.APIStatusError / ollama.ResponseError có status_code, google.api_core có code
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if isinstance(status, int):
+        return status in _TRANSIENT_STATUS or status >= 500
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+API_MAX_TRIES = 5
+API_MAX_DELAY = 30.0
+
+
+def _backoff_delay(attempt: int) -> float:
+    """1s, 2s, 4s, ... (tối đa API_MAX_DELAY) cộng jitter để các client không retry cùng lúc."""
+    return min(2.0 ** (attempt - 1), API_MAX_DELAY) + random.uniform(0, 1)
+
+
+def _api_retry(func):
+    """Retry từng request API (không phải cả generate) với exponential backoff + jitter."""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            for attempt in range(1, API_MAX_TRIES + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if attempt == API_MAX_TRIES or not _is_transient(e):
+                        raise
+                    delay = _backoff_delay(attempt)
+                    logger.warning(f"{func.__qualname__} failed ({e}), retry {attempt}/{API_MAX_TRIES - 1} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(1, API_MAX_TRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == API_MAX_TRIES or not _is_transient(e):
+                    raise
+                delay = _backoff_delay(attempt)
+                logger.warning(f"{func.__qualname__} failed ({e}), retry {attempt}/{API_MAX_TRIES - 1} in {delay:.1f}s")
+                time.sleep(delay)
+    return wrapper
+
+# Cache dùng chung cho các lời gọi temperature=0; đặt LLM_CACHE_DIR để lưu xuống disk.
+_default_cache = LLMCache(disk_path=os.getenv("LLM_CACHE_DIR"))
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_http_client() -> httpx.Client:
+    """Một httpx.Client dùng chung (keep-alive) cho mọi OpenAIChat, tạo lần đầu khi cần."""
+    client = httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    atexit.register(client.close)
+    return client
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_ollama_client(host: str) -> "ollama.Client":
+    """ollama.Client tự giữ httpx.Client bên trong, nên dùng chung một client cho mỗi host."""
+    import ollama
+
+    return ollama.Client(host=host, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
 
 class AuthenticationError(Exception):
     pass
 
 
 class LLMClient(ABC):
+    provider: str = ""
+    temperature: float = 0.0
+    cache: Optional[LLMCache] = None
+    semantic_cache: Optional[SemanticLLMCache] = None
+
+    def _cache_lookup(self, user_prompt: str, system_prompt: Optional[str]) -> Tuple[str, Optional[str]]:
+        key = LLMCache.make_key(self.provider, self.model_name, system_prompt, user_prompt, self.temperature)
+        if self.cache is not None and (cached := self.cache.get(key)) is not None:
+            return key, cached
+        if self.semantic_cache is not None:
+            namespace = LLMCache.make_key(self.provider, self.model_name, system_prompt, "", self.temperature)
+            if (cached := self.semantic_cache.get(namespace, user_prompt)) is not None:
+                return key, cached
+        return key, None
+
+    def _cache_store(self, key: str, user_prompt: str, system_prompt: Optional[str], message: str) -> None:
+        if self.cache is not None:
+            self.cache.set(key, message)
+        if self.semantic_cache is not None:
+            namespace = LLMCache.make_key(self.provider, self.model_name, system_prompt, "", self.temperature)
+            self.semantic_cache.set(namespace, user_prompt, message)
+
     @abstractmethod
     def generate(self, user_prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
         pass
 
+    async def generate_async(self, user_prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        return await asyncio.to_thread(self.generate, user_prompt, system_prompt, **kwargs)
+
 
 
 
 class GeminiChat(LLMClient):
+    provider = "gemini"
+    temperature = _GEMINI_GENERATION_CONFIG["temperature"]
+
     def __init__(self, model_name: str = "gemini-2.0-flash", api_key: Optional[str] = None):
         self.model_name = model_name
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
@@ -34,24 +156,29 @@ class GeminiChat(LLMClient):
     def _initialize_client(self) -> None:
         if not self.api_key:
             raise AuthenticationError("Gemini API key is required")
+        import google.generativeai as genai
+
         genai.configure(api_key = self.api_key)
-        generation_config = {
-            "temperature": 0.7,           
-            # "top_p": 0.9,                 
-            # "top_k": 40,                 
-            "max_output_tokens": 1024,
-        }
-        self._model = genai.GenerativeModel(model_name = self.model_name, generation_config = generation_config)
+        self._model = genai.GenerativeModel(model_name = self.model_name, generation_config = _GEMINI_GENERATION_CONFIG)
         logger.info(f"Initialized Gemini client with model: {self.model_name}")
 
     
-    def generate(self, user_prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+    @staticmethod
+    def _build_prompt(user_prompt: str, system_prompt: Optional[str]) -> str:
+        if system_prompt:
+            return f"System:{system_prompt}\n\nUser:{user_prompt}"
+        return user_prompt
+
+    @_api_retry
+    def _call_api(self, prompt: str, **kwargs):
+        return self._model.generate_content(prompt, **kwargs)
+
+    def generate(self, user_prompt: str, system_prompt: Optional[str] = None, stream: bool = False,
+                 **kwargs) -> Union[str, Iterator[str]]:
+        if stream:
+            return self._generate_stream(user_prompt, system_prompt)
         try:
-            if system_prompt:
-                full_prompt = f"System:{system_prompt}\n\nUser:{user_prompt}"
-            else:
-                full_prompt = user_prompt
-            response = self._model.generate_content(full_prompt)    
+            response = self._call_api(self._build_prompt(user_prompt, system_prompt))
             message = response.text if response.parts else "No response generated"
             return message
             
@@ -59,42 +186,132 @@ class GeminiChat(LLMClient):
             logger.error(f"Gemini generation failed: {e}")
             raise
 
+    def _generate_stream(self, user_prompt: str, system_prompt: Optional[str]) -> Iterator[str]:
+        try:
+            response = self._call_api(self._build_prompt(user_prompt, system_prompt), stream=True)
+            for chunk in response:
+                if chunk.parts:
+                    yield chunk.text
+
+        except Exception as e:
+            logger.error(f"Gemini generation failed: {e}")
+            raise
+
+    # generate_async: dùng bản to_thread của LLMClient. generate_content_async đi qua grpc.aio
+    # client global của google.generativeai, gắn với event loop tạo ra nó, nên hỏng khi
+    # Operator gọi asyncio.run lần thứ hai.
+
 
 class OpenAIChat(LLMClient):
-    def __init__(self, model_name: str = "gpt-4o-mini", api_key: Optional[str] = None):
+    provider = "openai"
+    temperature = _OPENAI_DEFAULTS["temperature"]
+
+    def __init__(self, model_name: str = "gpt-4o-mini", api_key: Optional[str] = None,
+                 cache: Optional[LLMCache] = _default_cache,
+                 semantic_cache: Optional[SemanticLLMCache] = None):
         self.model_name = model_name
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.cache = cache
+        self.semantic_cache = semantic_cache
         self._model = None  
+        self._async_model = None
+        self._async_loop = None
         self._initialize_client()
 
     def _initialize_client(self) -> None:
         if not self.api_key:
             raise AuthenticationError("OpenAI API key is required")
-        self._model = OpenAI(api_key=self.api_key)
+        from openai import OpenAI
+
+        # _api_retry đã retry lỗi tạm thời; tắt retry nội bộ của SDK để không nhân số request.
+        self._model = OpenAI(api_key=self.api_key, http_client=_shared_http_client(), max_retries=0)
         logger.info(f"Initialized OpenAI client with model: {self.model_name}")
 
-    def generate(self, user_prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+    @staticmethod
+    def _build_messages(user_prompt: str, system_prompt: Optional[str]) -> list:
+        return ([{"role": "system", "content": system_prompt}] if system_prompt else []) + \
+            [{"role": "user", "content": user_prompt}]
+
+    @staticmethod
+    def _extract_message(response) -> str:
+        return (
+            response.choices[0].message.content
+            if response and response.choices and response.choices[0].message and response.choices[0].message.content
+            else "No response generated"
+        )
+
+    @_api_retry
+    def _call_api(self, messages: list, **kwargs):
+        return self._model.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            **_OPENAI_DEFAULTS,
+            # top_p=0.9
+            **kwargs,
+        )
+
+    @_api_retry
+    async def _call_api_async(self, messages: list):
+        return await self._async_model.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            **_OPENAI_DEFAULTS,
+        )
+
+    def generate(self, user_prompt: str, system_prompt: Optional[str] = None, stream: bool = False,
+                 **kwargs) -> Union[str, Iterator[str]]:
+        if stream:
+            return self._generate_stream(user_prompt, system_prompt)
         try:
-            if system_prompt:
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ]
-            else:
-                messages = [{"role": "user", "content": user_prompt}]
-
-            response = self._model.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                temperature=0.0,
-                max_tokens=1024,
-                # top_p=0.9
-            )
-            message = (
-                response.choices[0].message.content
-                if response and response.choices and response.choices[0].message and response.choices[0].message.content
-                else "No response generated"
-            )
+            key, cached = self._cache_lookup(user_prompt, system_prompt)
+            if cached is not None:
+                return cached
+
+            response = self._call_api(self._build_messages(user_prompt, system_prompt))
+            message = self._extract_message(response)
+            self._cache_store(key, user_prompt, system_prompt, message)
+            return message
+
+        except Exception as e:
+            logger.error(f"OpenAI generation failed: {e}")
+            raise
+
+    def _generate_stream(self, user_prompt: str, system_prompt: Optional[str]) -> Iterator[str]:
+        try:
+            key, cached = self._cache_lookup(user_prompt, system_prompt)
+            if cached is not None:
+                yield cached
+                return
+
+            response = self._call_api(self._build_messages(user_prompt, system_prompt), stream=True)
+            parts = []
+            for chunk in response:
+                if chunk.choices and (delta := chunk.choices[0].delta.content):
+                    parts.append(delta)
+                    yield delta
+            if parts:
+                self._cache_store(key, user_prompt, system_prompt, "".join(parts))
+
+        except Exception as e:
+            logger.error(f"OpenAI generation failed: {e}")
+            raise
+
+    async def generate_async(self, user_prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        try:
+            key, cached = self._cache_lookup(user_prompt, system_prompt)
+            if cached is not None:
+                return cached
+
+            # AsyncOpenAI gắn với event loop đang chạy nên tạo lại khi loop đổi.
+            loop = asyncio.get_running_loop()
+            if self._async_model is None or self._async_loop is not loop:
+                from openai import AsyncOpenAI
+
+                self._async_model = AsyncOpenAI(api_key=self.api_key, max_retries=0)
+                self._async_loop = loop
+            response = await self._call_api_async(self._build_messages(user_prompt, system_prompt))
+            message = self._extract_message(response)
+            self._cache_store(key, user_prompt, system_prompt, message)
             return message
 
         except Exception as e:
@@ -102,10 +319,19 @@ class OpenAIChat(LLMClient):
             raise
 
 class OllamaChat(LLMClient):
-    def __init__(self, model_name: str = "llama3.2:3b", host: str = "http://localhost:11434"):
+    provider = "ollama"
+    temperature = _OLLAMA_OPTS["temperature"]
+
+    def __init__(self, model_name: str = "llama3.2:3b", host: str = "http://localhost:11434",
+                 cache: Optional[LLMCache] = _default_cache,
+                 semantic_cache: Optional[SemanticLLMCache] = None):
         self.model_name = model_name
         self.host = host
+        self.cache = cache
+        self.semantic_cache = semantic_cache
         self._model = None
+        self._async_model = None
+        self._async_loop = None
         self._initialize_client()
     
     def _initialize_client(self) -> None:
@@ -114,31 +340,93 @@ class OllamaChat(LLMClient):
         if not self.model_name:
             raise ValueError("Ollama model_name is required")
         
-        self._model = ollama.Client(host=self.host)
+        self._model = _shared_ollama_client(self.host)
         logger.info(f"Initialized Ollama client with host: {self.host}")
     
-    def generate(self, user_prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+    @staticmethod
+    def _build_messages(user_prompt: str, system_prompt: Optional[str]) -> list:
+        return ([{"role": "system", "content": system_prompt}] if system_prompt else []) + \
+            [{"role": "user", "content": user_prompt}]
+
+    @staticmethod
+    def _extract_message(response) -> str:
+        if not response or "message" not in response:
+            raise RuntimeError("Ollama response invalid or missing 'message'")
+
+        return response['message']['content'] if response.get("message") else "No response generated"
+
+    @_api_retry
+    def _call_api(self, messages: list, **kwargs):
+        return self._model.chat(
+            model=self.model_name,
+            messages=messages,
+            options=_OLLAMA_OPTS,
+            **kwargs,
+        )
+
+    @_api_retry
+    async def _call_api_async(self, messages: list):
+        return await self._async_model.chat(
+            model=self.model_name,
+            messages=messages,
+            options=_OLLAMA_OPTS,
+        )
+
+    def generate(self, user_prompt: str, system_prompt: Optional[str] = None, stream: bool = False,
+                 **kwargs) -> Union[str, Iterator[str]]:
+        if stream:
+            return self._generate_stream(user_prompt, system_prompt)
         try:
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": user_prompt})
-
-            response = self._model.chat(
-                model=self.model_name,
-                messages=messages,
-                options={
-                    "temperature": 0.0,
-                    "num_predict": 1024,
-                    # "top_p": 0.9,
-                    # "top_k": 40,
-                }
-            )
+            key, cached = self._cache_lookup(user_prompt, system_prompt)
+            if cached is not None:
+                return cached
 
-            if not response or "message" not in response:
-                raise RuntimeError("Ollama response invalid or missing 'message'")
+            response = self._call_api(self._build_messages(user_prompt, system_prompt))
+            message = self._extract_message(response)
+            self._cache_store(key, user_prompt, system_prompt, message)
+            return message
 
-            message = response['message']['content'] if response.get("message") else "No response generated"
+        except Exception as e:
+            logger.error(f"Ollama generation failed: {e}")
+            raise
+
+    def _generate_stream(self, user_prompt: str, system_prompt: Optional[str]) -> Iterator[str]:
+        try:
+            key, cached = self._cache_lookup(user_prompt, system_prompt)
+            if cached is not None:
+                yield cached
+                return
+
+            response = self._call_api(self._build_messages(user_prompt, system_prompt), stream=True)
+            parts = []
+            for chunk in response:
+                content = chunk["message"]["content"] if chunk.get("message") else ""
+                if content:
+                    parts.append(content)
+                    yield content
+            if parts:
+                self._cache_store(key, user_prompt, system_prompt, "".join(parts))
+
+        except Exception as e:
+            logger.error(f"Ollama generation failed: {e}")
+            raise
+
+    async def generate_async(self, user_prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        try:
+            key, cached = self._cache_lookup(user_prompt, system_prompt)
+            if cached is not None:
+                return cached
+
+            # ollama.AsyncClient gắn với event loop đang chạy nên tạo lại khi loop đổi.
+            loop = asyncio.get_running_loop()
+            if self._async_model is None or self._async_loop is not loop:
+                import ollama
+
+                self._async_model = ollama.AsyncClient(host=self.host)
+                self._async_loop = loop
+            response = await self._call_api_async(self._build_messages(user_prompt, system_prompt))
+            message = self._extract_message(response)
+            self._cache_store(key, user_prompt, system_prompt, message)
             return message
 
         except Exception as e:
@@ -147,11 +435,24 @@ class OllamaChat(LLMClient):
 
 
 
+_semantic_cache: Optional[SemanticLLMCache] = None
+
+
+def get_semantic_cache() -> SemanticLLMCache:
+    """SemanticLLMCache dùng chung, chỉ load model embedding khi thật sự bật."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SemanticLLMCache(persist_path=os.getenv("LLM_SEMANTIC_CACHE_PATH"))
+    return _semantic_cache
+
+
 class LLMFactory:
     @staticmethod
     def create(provider: str, **kwargs) -> LLMClient:
 
         provider = provider.lower()
+        # Semantic cache chỉ áp dụng cho provider deterministic (temperature=0).
+        semantic_cache = get_semantic_cache() if kwargs.get("enable_semantic_cache") else None
 
         if provider == "gemini":
             return GeminiChat(
@@ -163,12 +464,14 @@ class LLMFactory:
             return OpenAIChat(
                 model_name=kwargs.get("model_name", "gpt-4o-mini"),
                 api_key=kwargs.get("api_key"),
+                semantic_cache=semantic_cache,
             )
 
         elif provider == "ollama":
-            return OllamaClient(
+            return OllamaChat(
                 model_name=kwargs.get("model_name", "llama3.2:3b"),
                 host=kwargs.get("host", "http://localhost:11434"),
+                semantic_cache=semantic_cache,
             )
 
         else:
@@ -176,7 +479,29 @@ class LLMFactory:
 
 
 
-def Operator(user_prompt: str, system_prompt: Optional[str] = None):
+@functools.lru_cache(maxsize=None)
+def _get_gemini(model_name: str) -> GeminiChat:
+    return GeminiChat(model_name=model_name)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_openai(model_name: str) -> OpenAIChat:
+    return OpenAIChat(model_name=model_name)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_ollama(model_name: str, host: str) -> OllamaChat:
+    return OllamaChat(model_name=model_name, host=host)
+
+
+def _print_stream(label: str, tokens: Iterator[str]) -> None:
+    print(f"{label}: ", end="", flush=True)
+    for tok in tokens:
+        print(tok, end="", flush=True)
+    print()
+
+
+async def Operator_async(user_prompt: str, system_prompt: Optional[str] = None):
     print("=== LLM OPERATOR ===")
     # system_prompt = input("System prompt: ").strip()
     # user_prompt = input("User prompt: ").strip()
@@ -189,39 +514,50 @@ def Operator(user_prompt: str, system_prompt: Optional[str] = None):
     choice = input("Chọn mô hình (1/2/3/4): ").strip()
 
     if choice == "1":
-        client = GeminiChat(model_name="gemini-2.0-flash")
-        ans = client.generate(user_prompt, system_prompt)
-        print("Gemini:", ans)
+        client = _get_gemini("gemini-2.0-flash")
+        _print_stream("Gemini", client.generate(user_prompt, system_prompt, stream=True))
 
     elif choice == "2":
-        client = OpenAIChat(model_name="gpt-4o-mini")
-        ans = client.generate(user_prompt, system_prompt)
-        print("OpenAI:", ans)
+        client = _get_openai("gpt-4o-mini")
+        _print_stream("OpenAI", client.generate(user_prompt, system_prompt, stream=True))
 
     elif choice == "3":
-        client = OllamaChat(mGeminiChaodel_name="llama3.2:3b", host="http://localhost:11434")
-        ans = client.generate(user_prompt, system_prompt)
-        print("Ollama:", ans)
+        client = _get_ollama("llama3.2:3b", "http://localhost:11434")
+        _print_stream("Ollama", client.generate(user_prompt, system_prompt, stream=True))
 
     elif choice == "4":
-        print("\nGemini:")
-        client1 = GeminiChat(model_name="gemini-2.0-flash")
-        print(client1.generate(user_prompt, system_prompt))
-
-        print("\nOpenAI:")
-        client2 = OpenAIChat(model_name="gpt-4o-mini")
-        print(client2.generate(user_prompt, system_prompt))
-
-        print("\nOllama:")
-        client3 = OllamaChat(model_name="llama3.2:3b", host="http://localhost:11434")
-        print(client3.generate(user_prompt, system_prompt))
+        clients = {
+            "Gemini": _get_gemini("gemini-2.0-flash"),
+            "OpenAI": _get_openai("gpt-4o-mini"),
+            "Ollama": _get_ollama("llama3.2:3b", "http://localhost:11434"),
+        }
+        # Gọi song song: thời gian chờ = provider chậm nhất thay vì tổng cả ba.
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(client.generate_async(user_prompt, system_prompt), GENERATE_TIMEOUT)
+                for client in clients.values()
+            ),
+            return_exceptions=True,
+        )
+        for name, result in zip(clients, results):
+            print(f"\n{name}:")
+            if isinstance(result, BaseException):
+                print(f"Lỗi: {result!r}")
+            else:
+                print(result)
 
     else:
         print("Lựa chọn không hợp lệ")
         sys.exit(1)
-s = input("System prompt: ").strip()
-u = input("User prompt: ").strip()    
-Operator(u,s)# system_prompt = input("System prompt: ").strip()
+
+
+def Operator(user_prompt: str, system_prompt: Optional[str] = None):
+    asyncio.run(Operator_async(user_prompt, system_prompt))
+if __name__ == "__main__":
+    s = input("System prompt: ").strip()
+    u = input("User prompt: ").strip()
+    Operator(u,s)
+# system_prompt = input("System prompt: ").strip()
     # user_prompt = input("User prompt: ").strip()
     # print("=== LLM OPERATOR ===")
     # system_prompt = input("System prompt: ").strip()